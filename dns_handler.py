@@ -11,43 +11,77 @@ import struct
 import logging
 import platform
 import subprocess
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple
 import base64
+from yarl import URL
 
 logger = logging.getLogger(__name__)
 
+# DoH endpoints, parsed once at import rather than on every query
+DOH_PROVIDERS = {
+    'cloudflare': {
+        'url': URL('https://cloudflare-dns.com/dns-query'),
+        'ip': '1.1.1.1'
+    },
+    'google': {
+        'url': URL('https://dns.google/dns-query'),
+        'ip': '8.8.8.8'
+    },
+    'quad9': {
+        'url': URL('https://dns.quad9.net/dns-query'),
+        'ip': '9.9.9.9'
+    },
+    'adguard': {
+        'url': URL('https://dns.adguard.com/dns-query'),
+        'ip': '94.140.14.14'
+    }
+}
+
+# Known addresses of the DoH endpoints themselves, so reaching a provider
+# never depends on the system resolver we are about to replace
+_DOH_BOOTSTRAP = {info['url'].host: info['ip'] for info in DOH_PROVIDERS.values()}
+
+class _BootstrapResolver(aiohttp.ThreadedResolver):
+    """Resolver that answers DoH endpoint names from _DOH_BOOTSTRAP"""
+    
+    async def resolve(self, host: str, port: int = 0,
+                      family: socket.AddressFamily = socket.AF_INET) -> List[Dict]:
+        ip = _DOH_BOOTSTRAP.get(host)
+        if ip is not None and family in (socket.AF_INET, socket.AF_UNSPEC):
+            return [{
+                'hostname': host,
+                'host': ip,
+                'port': port,
+                'family': socket.AF_INET,
+                'proto': 0,
+                'flags': socket.AI_NUMERICHOST
+            }]
+        return await super().resolve(host, port, family)
+
 class DNSHandler:
     """
     Handles DNS-over-HTTPS queries and DNS leak prevention
     Supports multiple DoH providers and proxy routing
     """
     
+    # Most DoH answers kept; least recently used names are evicted first
+    CACHE_MAX_ENTRIES = 1024
+    
     def __init__(self):
         self.session: Optional[aiohttp.ClientSession] = None
         self.original_dns_servers: List[str] = []
-        self.doh_servers = {
-            'cloudflare': {
-                'url': 'https://cloudflare-dns.com/dns-query',
-                'ip': '1.1.1.1'
-            },
-            'google': {
-                'url': 'https://dns.google/dns-query',
-                'ip': '8.8.8.8'
-            },
-            'quad9': {
-                'url': 'https://dns.quad9.net/dns-query',
-                'ip': '9.9.9.9'
-            },
-            'adguard': {
-                'url': 'https://dns.adguard.com/dns-query',
-                'ip': '94.140.14.14'
-            }
-        }
+        self.doh_servers = DOH_PROVIDERS
         self.current_provider = 'cloudflare'
         self.proxy_settings: Optional[Dict] = None
         self.dns_server_port = 5353
         self.running = False
         self.tor_mode = False
+        
+        # DoH answer cache keyed by (domain, qtype) -> (ips, expires_at), in LRU order
+        self._cache: 'OrderedDict[Tuple[str, int], Tuple[List[str], float]]' = OrderedDict()
+        # In-flight DoH lookups, so identical concurrent queries share one request
+        self._pending: Dict[Tuple[str, int], asyncio.Future] = {}
     
     async def start_doh(self, provider: str = 'cloudflare'):
         """
@@ -64,19 +98,7 @@ class DNSHandler:
         self.current_provider = provider
         
         # Create HTTP session
-        connector = aiohttp.TCPConnector(
-            ssl=True,
-            limit=100,
-            limit_per_host=30,
-            keepalive_timeout=30,
-            enable_cleanup_closed=True
-        )
-        
-        timeout = aiohttp.ClientTimeout(total=10, connect=5)
-        self.session = aiohttp.ClientSession(
-            connector=connector,
-            timeout=timeout
-        )
+        await self._create_session(total=10, connect=5)
         
         # Backup original DNS settings
         await self._backup_dns_settings()
@@ -105,19 +127,7 @@ class DNSHandler:
         }
         
         # Create HTTP session with proxy
-        connector = aiohttp.TCPConnector(
-            ssl=True,
-            limit=100,
-            limit_per_host=30,
-            keepalive_timeout=30,
-            enable_cleanup_closed=True
-        )
-        
-        timeout = aiohttp.ClientTimeout(total=15, connect=10)
-        self.session = aiohttp.ClientSession(
-            connector=connector,
-            timeout=timeout
-        )
+        await self._create_session(total=15, connect=10)
         
         # Backup original DNS settings
         await self._backup_dns_settings()
@@ -152,6 +162,36 @@ class DNSHandler:
         self.running = True
         logger.info("Tor DNS resolution started successfully")
     
+    async def _create_session(self, total: float, connect: float):
+        """
+        Create the pooled HTTP session shared by all DoH queries
+        
+        Connections to the provider are kept alive between queries so
+        only the first lookup pays for the TCP and TLS handshakes.
+        
+        Args:
+            total: Total request timeout in seconds
+            connect: Connection timeout in seconds
+        """
+        # Don't leak the pool of a previous start
+        if self.session and not self.session.closed:
+            await self.session.close()
+        
+        connector = aiohttp.TCPConnector(
+            ssl=True,
+            resolver=_BootstrapResolver(),
+            limit=100,
+            limit_per_host=30,
+            keepalive_timeout=60,
+            enable_cleanup_closed=True
+        )
+        
+        timeout = aiohttp.ClientTimeout(total=total, connect=connect)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout
+        )
+    
     async def _backup_dns_settings(self):
         """Backup current system DNS settings"""
         try:
@@ -319,7 +359,7 @@ class DNSHandler:
     
     async def _resolve_via_doh(self, domain: str, query_type: int) -> Optional[List[str]]:
         """
-        Resolve domain using DNS-over-HTTPS
+        Resolve domain using DNS-over-HTTPS, honoring answer TTLs
         
         Args:
             domain: Domain to resolve
@@ -328,6 +368,59 @@ class DNSHandler:
         Returns:
             List of IP addresses or None if resolution fails
         """
+        key = (domain.lower(), query_type)
+        loop = asyncio.get_running_loop()
+        
+        cached = self._cache.get(key)
+        if cached:
+            if cached[1] > loop.time():
+                logger.debug(f"DoH cache hit for {domain}")
+                self._cache.move_to_end(key)
+                return cached[0]
+            del self._cache[key]
+        
+        # Coalesce with an identical lookup that is already in flight
+        pending = self._pending.get(key)
+        if pending:
+            return await asyncio.shield(pending)
+        
+        future = loop.create_future()
+        self._pending[key] = future
+        try:
+            ips = None
+            result = await self._query_doh(domain, query_type)
+            if result:
+                ips, ttl = result
+                self._cache_answer(key, ips, loop.time(), ttl)
+            future.set_result(ips)
+            return ips
+        finally:
+            self._pending.pop(key, None)
+            if not future.done():
+                future.set_result(None)
+    
+    def _cache_answer(self, key: Tuple[str, int], ips: List[str], now: float, ttl: int):
+        """Store a DoH answer, evicting expired then least recently used entries"""
+        self._cache[key] = (ips, now + ttl)
+        self._cache.move_to_end(key)
+        
+        if len(self._cache) > self.CACHE_MAX_ENTRIES:
+            for stale in [k for k, (_, expires) in self._cache.items() if expires <= now]:
+                del self._cache[stale]
+            while len(self._cache) > self.CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+    
+    async def _query_doh(self, domain: str, query_type: int) -> Optional[Tuple[List[str], int]]:
+        """
+        Send a single DNS-over-HTTPS query
+        
+        Args:
+            domain: Domain to resolve
+            query_type: DNS query type (1=A, 28=AAAA, etc.)
+            
+        Returns:
+            Tuple of (IP addresses, lowest answer TTL) or None if resolution fails
+        """
         try:
             provider = self.doh_servers[self.current_provider]
             
@@ -357,14 +450,16 @@ class DNSHandler:
                         
                         # Extract IP addresses from response
                         ips = []
+                        ttl = 300
                         if 'Answer' in result:
                             for answer in result['Answer']:
                                 if answer.get('type') == query_type:
                                     ips.append(answer.get('data'))
+                                    ttl = min(ttl, answer.get('TTL', ttl))
                         
                         if ips:
-                            logger.debug(f"Resolved {domain} to {ips}")
-                            return ips
+                            logger.debug(f"Resolved {domain} to {ips} (TTL {ttl}s)")
+                            return ips, ttl
             
             logger.debug(f"No resolution for {domain}")
             return None
@@ -534,6 +629,7 @@ class DNSHandler:
         logger.info("Stopping DNS handler...")
         
         self.running = False
+        self._cache.clear()
         
         try:
             # Close HTTP session
@@ -30,6 +30,11 @@ class MeekHandler:
         self.tor_socks_port: Optional[int] = None
         self.is_running = False
         self.temp_dir: Optional[str] = None
+        self.tor_data_dir: Optional[str] = None
+        
+        # Set once the local meek listener is up (or startup has failed)
+        self._listener_ready = asyncio.Event()
+        self._start_failed = False
         
         # meek configuration
         self.config = {
@@ -100,6 +105,10 @@ class MeekHandler:
         """
         logger.info(f"Starting meek transport with {provider} domain fronting")
         
+        # Forget any earlier failed attempt before waiters look at the event
+        self._start_failed = False
+        self._listener_ready.clear()
+        
         try:
             # Set fronting provider
             await self.set_fronting_provider(provider)
@@ -113,6 +122,7 @@ class MeekHandler:
             
             # Start meek client
             await self._start_meek_client()
+            self._listener_ready.set()
             
             # Verify meek is working
             await self._verify_meek()
@@ -123,14 +133,38 @@ class MeekHandler:
         except Exception as e:
             logger.error(f"Failed to start meek transport: {e}")
             await self.stop()
+            self._start_failed = True
+            self._listener_ready.set()
             raise
     
-    async def start_tor_over_meek(self):
-        """Start Tor using meek as transport"""
+    async def ready_for_tor(self) -> bool:
+        """
+        Wait until the local meek listener accepts connections
+        
+        Resolves before the CDN path is verified so Tor can bootstrap
+        while meek is still warming up.
+        
+        Returns:
+            True if the listener is up, False if meek failed to start
+        """
+        await self._listener_ready.wait()
+        return not self._start_failed
+    
+    async def start_tor_over_meek(self, data_dir: Optional[str] = None):
+        """
+        Start Tor using meek as transport
+        
+        Args:
+            data_dir: Persistent Tor DataDirectory; reusing one across runs
+                      keeps the cached consensus and skips a cold bootstrap
+        """
         logger.info("Starting Tor over meek transport")
         
+        if data_dir:
+            self.tor_data_dir = str(data_dir)
+        
         try:
-            if not self.is_running:
+            if self._start_failed or (not self.is_running and not self._listener_ready.is_set()):
                 raise RuntimeError("meek transport must be started first")
             
             # Create Tor configuration
@@ -278,10 +312,11 @@ class MeekHandler:
         """Create Tor configuration file for meek transport"""
         try:
             config_path = os.path.join(self.temp_dir, 'torrc')
+            data_dir = self.tor_data_dir or f"{self.temp_dir}/tor_data"
             
             config_content = f"""
 # Tor configuration for meek transport
-DataDirectory {self.temp_dir}/tor_data
+DataDirectory {data_dir}
 Log notice file {self.temp_dir}/tor.log
 
 # SOCKS proxy
@@ -515,6 +550,7 @@ SafeLogging 1
                 self.temp_dir = None
             
             self.is_running = False
+            self._listener_ready.clear()
             self.local_port = None
             self.tor_socks_port = None
             
@@ -8,6 +8,7 @@ import sys
 import os
 import asyncio
 import logging
+import subprocess
 
 # Configure basic logging
 logging.basicConfig(level=logging.INFO)
@@ -183,13 +184,36 @@ def test_dependencies():
     
     return True
 
+def test_menu_piped_input():
+    """Test that the test mode menu takes piped choices line by line and exits"""
+    logger.info("Testing test mode menu with piped input...")
+    
+    try:
+        result = subprocess.run(
+            [sys.executable, 'test_mode.py'],
+            input=b'9\n0\n',
+            capture_output=True,
+            timeout=30
+        )
+    except subprocess.TimeoutExpired:
+        logger.error("✗ Test mode menu did not exit on piped input")
+        return False
+    
+    output = result.stdout.decode('utf-8', 'replace')
+    if 'Invalid choice' not in output or 'Exiting test mode' not in output:
+        logger.error("✗ Test mode menu did not handle piped choices one line at a time")
+        return False
+    
+    logger.info("✓ Test mode menu handles piped input and exits")
+    return True
+
 async def main():
     """Main test function"""
     logger.info("Starting integration tests for Network Obfuscation System")
     logger.info("=" * 60)
     
     tests_passed = 0
-    total_tests = 4
+    total_tests = 5
     
     # Test 1: Module imports
     if test_imports():
@@ -225,6 +249,15 @@ async def main():
     else:
         logger.error("✗ Dependencies test FAILED")
     
+    logger.info("-" * 40)
+    
+    # Test 5: Test mode menu with piped input
+    if test_menu_piped_input():
+        tests_passed += 1
+        logger.info("✓ Piped menu input test PASSED")
+    else:
+        logger.error("✗ Piped menu input test FAILED")
+    
     logger.info("=" * 60)
     logger.info(f"Integration tests completed: {tests_passed}/{total_tests} tests passed")
     
@@ -5,9 +5,15 @@ Uses only free services for testing the obfuscation system
 """
 
 import asyncio
+import functools
 import logging
+import shutil
 import sys
 import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,17 +32,7 @@ except ImportError as e:
 class TestModeSystem:
     """Free test mode system using only free services"""
     
-    def __init__(self):
-        self.dns_handler = DNSHandler()
-        self.firewall_handler = FirewallHandler() 
-        self.padding_handler = PaddingHandler()
-        self.meek_handler = MeekHandler()
-        self.shadowsocks_handler = ShadowsocksHandler()
-        self.running = False
-    
-    def display_banner(self):
-        """Display test mode banner"""
-        banner = """
+    _BANNER = """
 ╔══════════════════════════════════════════════════════════════╗
 ║                    🆓 FREE TEST MODE 🆓                      ║
 ║             No VPS or Paid Services Required                ║
@@ -44,11 +40,8 @@ class TestModeSystem:
 ║  Test all obfuscation features using free services only     ║
 ╚══════════════════════════════════════════════════════════════╝
         """
-        print(banner)
     
-    def display_menu(self):
-        """Display free test options"""
-        menu = """
+    _MENU = """
 ┌─────────────────────────────────────────────────────────────┐
 │                    Free Test Options                       │
 ├─────────────────────────────────────────────────────────────┤
@@ -76,7 +69,135 @@ class TestModeSystem:
 │  [0] Exit                                                   │
 └─────────────────────────────────────────────────────────────┘
         """
-        print(menu)
+    
+    _SUCCESS_TOR_MEEK = "\n".join([
+        "\n🎉 SUCCESS! Tor + meek is now running!",
+        "📊 Your traffic is now:",
+        "   ✓ Encrypted through Tor network",
+        "   ✓ Hidden via domain fronting (appears as CDN traffic)",
+        "   ✓ DNS queries secured via DoH",
+        "   ✓ Packet sizes randomized",
+        "   ✓ Timing patterns obfuscated",
+        "\n🌐 SOCKS5 Proxy: 127.0.0.1:{socks_port}",
+        "   Configure your applications to use this proxy",
+        "\n📋 Test your connection:",
+        "   • Visit: https://check.torproject.org",
+        "   • Visit: https://ipleak.net",
+        "   • Check your IP appears as Tor exit node",
+        "\nPress Ctrl+C to stop...",
+        ""
+    ])
+    
+    # Encoded once so redisplaying the menu skips the text layer
+    _BANNER_BYTES = (_BANNER + '\n').encode('utf-8')
+    _MENU_BYTES = (_MENU + '\n').encode('utf-8')
+    
+    def __init__(self):
+        self.dns_handler = DNSHandler()
+        self.firewall_handler = FirewallHandler() 
+        self.padding_handler = PaddingHandler()
+        self.meek_handler = MeekHandler()
+        self.shadowsocks_handler = ShadowsocksHandler()
+        self.running = False
+        self._stop = asyncio.Event()
+        self._bin_cache: dict[str, tuple[bool, float]] = {}
+        self._stats_hist: deque = deque(maxlen=12)
+        
+        # Caps on concurrent network probes, overall and per host
+        self._probe_sem = asyncio.Semaphore(50)
+        self._per_host_sems: dict[str, asyncio.Semaphore] = {}
+        
+        # Menu choice -> test coroutine
+        self._actions = {
+            '1': self.test_tor_meek,
+            '2': self.test_dns_only,
+            '3': self.test_packet_padding,
+            '4': self.test_free_shadowsocks
+        }
+        
+        # Persistent Tor state so later runs skip the consensus download;
+        # created only when the Tor test actually starts
+        self.tor_data_dir = Path.home() / ".cache" / "undercover_net" / "tor"
+        
+        # Bytes read from stdin past the last line handed out by _read_input
+        self._stdin_buffer = b''
+    
+    def display_banner(self):
+        """Display test mode banner"""
+        self._write_bytes(self._BANNER_BYTES)
+    
+    def display_menu(self):
+        """Display free test options"""
+        self._write_bytes(self._MENU_BYTES)
+    
+    def _write_bytes(self, data: bytes):
+        """Write pre-encoded UTF-8 straight to stdout's binary buffer"""
+        buffer = getattr(sys.stdout, 'buffer', None)
+        if buffer is None:  # stdout replaced by a text-only stream
+            sys.stdout.write(data.decode('utf-8'))
+            return
+        
+        sys.stdout.flush()  # Keep ordering with anything already printed
+        buffer.write(data)
+        buffer.flush()
+    
+    async def _read_input(self, prompt: str) -> str:
+        """
+        Read a line from stdin without blocking the event loop
+        
+        The read runs in a daemon thread rather than the default executor:
+        asyncio.run() waits for executor threads on shutdown, so Ctrl+C at
+        the prompt would hang until Enter was pressed. It reads the raw fd,
+        not input(), so the abandoned thread holds no lock on sys.stdin
+        that interpreter shutdown would need. A read can return several
+        lines when stdin is a pipe, so anything after the first newline is
+        kept for the next call.
+        
+        Raises:
+            EOFError: stdin is closed and no buffered line is left
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        fd = sys.stdin.fileno()
+        
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        
+        def deliver(setter, value):
+            if not future.done():
+                setter(value)
+        
+        def read():
+            try:
+                buffer = self._stdin_buffer
+                while b'\n' not in buffer:
+                    data = os.read(fd, 1024)
+                    if not data:
+                        break
+                    buffer += data
+                if not buffer:
+                    raise EOFError
+                line, _, self._stdin_buffer = buffer.partition(b'\n')
+                result = (future.set_result, line.decode('utf-8', 'replace').rstrip('\r'))
+            except BaseException as e:  # EOFError or OSError on stdin
+                result = (future.set_exception, e)
+            try:
+                loop.call_soon_threadsafe(deliver, *result)
+            except RuntimeError:  # Loop already closed
+                pass
+        
+        threading.Thread(target=read, daemon=True).start()
+        return await future
+    
+    def _have_bin(self, name: str, ttl: float = 300.0) -> bool:
+        """Check binary presence on PATH, caching the result across menu invocations"""
+        cached = self._bin_cache.get(name)
+        if cached and time.monotonic() - cached[1] < ttl:
+            return cached[0]
+        
+        present = shutil.which(name) is not None
+        self._bin_cache[name] = (present, time.monotonic())
+        return present
     
     async def test_tor_meek(self):
         """Test Tor + meek - completely free"""
@@ -85,73 +206,63 @@ class TestModeSystem:
         try:
             print("🔍 Testing Tor + meek (completely free)...")
             
-            # Check if Tor is installed
-            import subprocess
-            try:
-                result = subprocess.run(['tor', '--version'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    print("✓ Tor is installed and ready")
-                else:
-                    raise FileNotFoundError
-            except (FileNotFoundError, subprocess.TimeoutExpired):
+            # Presence checks are a PATH scan, no process spawn needed
+            if self._have_bin('tor'):
+                print("✓ Tor is installed and ready")
+            else:
                 print("❌ Tor not found. Please install:")
                 print("   Windows: choco install tor")
                 print("   Ubuntu/Debian: sudo apt install tor")
                 print("   macOS: brew install tor")
                 return
             
-            # Check if meek-client is available
-            try:
-                result = subprocess.run(['meek-client', '--help'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode != 0:
-                    raise FileNotFoundError
+            if self._have_bin('meek-client'):
                 print("✓ meek-client is available")
-            except (FileNotFoundError, subprocess.TimeoutExpired):
+            else:
                 print("❌ meek-client not found. This is part of Tor browser bundle.")
                 print("   For full functionality, install Tor browser or meek plugin")
                 print("   Continuing with basic Tor (without domain fronting)...")
             
-            # Start DNS-over-HTTPS
+            # Start DNS-over-HTTPS and packet padding together
             print("🌐 Starting DNS-over-HTTPS...")
-            await self.dns_handler.start_doh('cloudflare')
-            print("✓ DNS-over-HTTPS active")
-            
-            # Start packet padding
             print("📦 Starting packet padding...")
-            await self.padding_handler.start()
+            await asyncio.gather(
+                self.dns_handler.start_doh('cloudflare'),
+                self.padding_handler.start()
+            )
+            print("✓ DNS-over-HTTPS active")
             print("✓ Packet padding active")
             
             # Start meek transport
             print("🎭 Starting meek domain fronting...")
-            await self.meek_handler.start('azure')  # Free Azure CDN fronting
+            meek_task = asyncio.create_task(self.meek_handler.start('azure'))  # Free Azure CDN fronting
             
-            # Start Tor over meek
+            # Start Tor over meek as soon as the listener is up
+            if not await self.meek_handler.ready_for_tor():
+                await meek_task  # Re-raises the startup failure
             print("🔒 Starting Tor over meek...")
-            await self.meek_handler.start_tor_over_meek()
-            
-            print("\n🎉 SUCCESS! Tor + meek is now running!")
-            print("📊 Your traffic is now:")
-            print("   ✓ Encrypted through Tor network")
-            print("   ✓ Hidden via domain fronting (appears as CDN traffic)")
-            print("   ✓ DNS queries secured via DoH")
-            print("   ✓ Packet sizes randomized")
-            print("   ✓ Timing patterns obfuscated")
-            
-            print(f"\n🌐 SOCKS5 Proxy: 127.0.0.1:{self.meek_handler.get_socks_port()}")
-            print("   Configure your applications to use this proxy")
-            
-            print("\n📋 Test your connection:")
-            print("   • Visit: https://check.torproject.org")
-            print("   • Visit: https://ipleak.net")
-            print("   • Check your IP appears as Tor exit node")
+            self.tor_data_dir.mkdir(parents=True, exist_ok=True)
+            tor_task = asyncio.create_task(
+                self.meek_handler.start_tor_over_meek(data_dir=self.tor_data_dir)
+            )
+            try:
+                await asyncio.gather(meek_task, tor_task)
+            except BaseException:
+                # gather leaves the other task running; don't let Tor keep
+                # starting against a meek transport that stop() tore down
+                for task in (meek_task, tor_task):
+                    task.cancel()
+                await asyncio.gather(meek_task, tor_task, return_exceptions=True)
+                raise
             
-            print("\nPress Ctrl+C to stop...")
+            sys.stdout.write(self._SUCCESS_TOR_MEEK.format(
+                socks_port=self.meek_handler.get_socks_port()
+            ))
+            sys.stdout.flush()
             
             self.running = True
-            while self.running:
-                await asyncio.sleep(1)
+            self._stop.clear()
+            await self._stop.wait()
                 
         except KeyboardInterrupt:
             print("\n🛑 Stopping test...")
@@ -195,8 +306,8 @@ class TestModeSystem:
             print("\nPress Ctrl+C to stop...")
             
             self.running = True
-            while self.running:
-                await asyncio.sleep(1)
+            self._stop.clear()
+            await self._stop.wait()
                 
         except KeyboardInterrupt:
             print("\n🛑 Stopping test...")
@@ -205,6 +316,13 @@ class TestModeSystem:
         finally:
             await self.cleanup()
     
+    def _record_padding_sample(self):
+        """Append a (time, dummy, padded) sample to the stats ring buffer"""
+        stats = self.padding_handler.get_stats()
+        self._stats_hist.append(
+            (time.monotonic(), stats['dummy_packets_sent'], stats['packets_padded'])
+        )
+    
     async def test_packet_padding(self):
         """Test packet padding and timing obfuscation"""
         logger.info("Starting packet padding test")
@@ -230,11 +348,20 @@ class TestModeSystem:
             print("\nPress Ctrl+C to stop...")
             
             self.running = True
-            while self.running:
-                await asyncio.sleep(5)
-                stats = self.padding_handler.get_stats()
-                print(f"📊 Stats: {stats['dummy_packets_sent']} dummy packets sent, "
-                      f"{stats['packets_padded']} packets padded")
+            self._stop.clear()
+            self._stats_hist.clear()
+            self._record_padding_sample()
+            while not self._stop.is_set():
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    self._record_padding_sample()
+                    # Rate over the last minute of samples, not cumulative totals
+                    t0, dummy0, padded0 = self._stats_hist[0]
+                    t1, dummy1, padded1 = self._stats_hist[-1]
+                    dt = t1 - t0
+                    print(f"📊 Rate: {(dummy1 - dummy0) / dt:.1f} dummy/s, "
+                          f"{(padded1 - padded0) / dt:.1f} padded/s")
                 
         except KeyboardInterrupt:
             print("\n🛑 Stopping test...")
@@ -243,6 +370,25 @@ class TestModeSystem:
         finally:
             await self.cleanup()
     
+    async def _throttled(self, host: str, coro):
+        """Run a probe coroutine under the global and per-host concurrency limits"""
+        sem = self._per_host_sems.setdefault(host, asyncio.Semaphore(8))
+        try:
+            async with self._probe_sem, sem:
+                return await coro
+        finally:
+            coro.close()  # No-op once run; avoids a never-awaited warning if cancelled while queued
+    
+    async def _probe_shadowsocks_server(self, server: dict) -> tuple[dict, bool]:
+        """Test connectivity to a free server, returning it alongside the result"""
+        connectivity = await self._throttled(
+            server['server'],
+            self.shadowsocks_handler.test_server_connectivity(
+                server['server'], server['server_port'], timeout=10.0
+            )
+        )
+        return server, connectivity
+    
     async def test_free_shadowsocks(self):
         """Test with free Shadowsocks servers"""
         logger.info("Starting free Shadowsocks test")
@@ -261,15 +407,23 @@ class TestModeSystem:
                 }
             ]
             
+            # Probe every server at once and try them in the order they answer
             for server in free_servers:
                 print(f"🔍 Testing server: {server['server']}")
-                
-                # Test connectivity first
-                connectivity = await self.shadowsocks_handler.test_server_connectivity(
-                    server['server'], server['server_port'], timeout=10.0
-                )
-                
-                if connectivity:
+            
+            probes = [
+                asyncio.create_task(self._probe_shadowsocks_server(server))
+                for server in free_servers
+            ]
+            
+            try:
+                for probe in asyncio.as_completed(probes):
+                    server, connectivity = await probe
+                    
+                    if not connectivity:
+                        print(f"❌ Server {server['server']} not reachable")
+                        continue
+                    
                     print(f"✓ Server {server['server']} is reachable")
                     
                     # Configure and start
@@ -282,28 +436,31 @@ class TestModeSystem:
                     
                     try:
                         await self.shadowsocks_handler.start()
-                        
-                        print(f"\n🎉 SUCCESS! Connected to free server!")
-                        print(f"📊 SOCKS5 Proxy: 127.0.0.1:{self.shadowsocks_handler.get_proxy_port()}")
-                        print("   Configure your browser to use this proxy")
-                        
-                        print("\n📋 Test your connection:")
-                        print("   • Visit: https://whatismyipaddress.com")
-                        print("   • Your IP should be different now")
-                        
-                        print("\nPress Ctrl+C to stop...")
-                        
-                        self.running = True
-                        while self.running:
-                            await asyncio.sleep(1)
-                        
-                        break
-                        
                     except Exception as e:
                         print(f"❌ Failed to connect: {e}")
                         continue
-                else:
-                    print(f"❌ Server {server['server']} not reachable")
+                    
+                    # Remaining probes are no longer needed
+                    for task in probes:
+                        task.cancel()
+                    
+                    print(f"\n🎉 SUCCESS! Connected to free server!")
+                    print(f"📊 SOCKS5 Proxy: 127.0.0.1:{self.shadowsocks_handler.get_proxy_port()}")
+                    print("   Configure your browser to use this proxy")
+                    
+                    print("\n📋 Test your connection:")
+                    print("   • Visit: https://whatismyipaddress.com")
+                    print("   • Your IP should be different now")
+                    
+                    print("\nPress Ctrl+C to stop...")
+                    
+                    self.running = True
+                    self._stop.clear()
+                    await self._stop.wait()
+                    return
+            finally:
+                for task in probes:
+                    task.cancel()
             
             print("❌ No free servers available at the moment")
             print("💡 Try option 1 (Tor + meek) instead - always works!")
@@ -319,10 +476,18 @@ class TestModeSystem:
         """Clean up all services"""
         try:
             self.running = False
-            await self.padding_handler.stop()
-            await self.dns_handler.stop() 
-            await self.meek_handler.stop()
-            await self.shadowsocks_handler.stop()
+            self._stop.set()
+            # Handlers are independent, so stop them concurrently
+            results = await asyncio.gather(
+                self.padding_handler.stop(),
+                self.dns_handler.stop(),
+                self.meek_handler.stop(),
+                self.shadowsocks_handler.stop(),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(f"Cleanup error: {result}")
             print("✓ All services stopped")
         except Exception as e:
             logger.error(f"Cleanup error: {e}")
@@ -335,34 +500,35 @@ class TestModeSystem:
             self.display_menu()
             
             try:
-                choice = input("\nSelect test option (0-4): ").strip()
+                choice = (await self._read_input("\nSelect test option (0-4): ")).strip()
                 
                 if choice == '0':
                     print("Exiting test mode...")
                     break
                 
-                elif choice == '1':
-                    await self.test_tor_meek()
-                
-                elif choice == '2':
-                    await self.test_dns_only()
-                
-                elif choice == '3':
-                    await self.test_packet_padding()
-                
-                elif choice == '4':
-                    await self.test_free_shadowsocks()
-                
-                else:
+                action = self._actions.get(choice)
+                if action is None:
                     print("Invalid choice. Please select 0-4.")
                     continue
                 
-            except KeyboardInterrupt:
+                await action()
+                
+            except (KeyboardInterrupt, asyncio.CancelledError, EOFError):
+                # Ctrl+C reaches the prompt as a cancellation under asyncio.run();
+                # closed stdin means no further choices can arrive
                 await self.cleanup()
                 break
             except Exception as e:
                 logger.error(f"Error: {e}")
 
+@functools.lru_cache(maxsize=1)
+def _is_admin() -> bool:
+    """Check for Administrator/root privileges (cached)"""
+    if os.name == 'nt':  # Windows
+        import ctypes
+        return bool(ctypes.windll.shell32.IsUserAnAdmin())
+    return os.geteuid() == 0
+
 def main():
     """Entry point"""
     print("🆓 FREE TEST MODE - No VPS or paid services required!")
@@ -370,15 +536,12 @@ def main():
     print()
     
     # Check admin privileges for some features
-    if os.name == 'nt':  # Windows
-        import ctypes
-        if not ctypes.windll.shell32.IsUserAnAdmin():
+    if not _is_admin():
+        if os.name == 'nt':  # Windows
             print("⚠️  For full functionality, run as Administrator")
-            print("   (Required for firewall kill switch)")
-    else:  # Linux/Unix
-        if os.geteuid() != 0:
+        else:  # Linux/Unix
             print("⚠️  For full functionality, run with sudo")
-            print("   (Required for firewall kill switch)")
+        print("   (Required for firewall kill switch)")
     
     print()
     
@@ -5,18 +5,28 @@ Visual dashboard to see protection status in real-time
 """
 
 import asyncio
+import gzip
+import hashlib
+import itertools
 import json
 import time
 import logging
+import signal
 import socket
 import subprocess
 import platform
-from datetime import datetime
+from collections import deque
+import aiohttp
 from aiohttp import web, WSMsgType
 import aiohttp_cors
-import weakref
 import psutil
 
+# orjson is optional; it is much faster and encodes straight to bytes
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,49 +38,138 @@ except ImportError as e:
     logger.error(f"Import error: {e}")
     exit(1)
 
+def _dumps(obj) -> bytes:
+    """Serialize a WebSocket payload to UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+def _loads(data):
+    """Parse an incoming WebSocket JSON message"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 class WebMonitor:
     """Web-based real-time protection monitor"""
     
+    # Clients sent to per gather() before yielding to the event loop
+    BROADCAST_BATCH_SIZE = 50
+    
+    # Seconds between periodic broadcasts, and while the CPU is above BUSY_CPU_PERCENT
+    UPDATE_INTERVAL = 2
+    BUSY_UPDATE_INTERVAL = 5
+    BUSY_CPU_PERCENT = 80
+    
+    # Seconds between WebSocket pings; a peer that misses the pong is closed
+    HEARTBEAT_INTERVAL = 15
+    
+    # Seconds a client may take to accept a broadcast before it is dropped
+    SEND_TIMEOUT = 1.0
+    
+    # Seconds to wait so broadcasts requested close together go out as one frame
+    BROADCAST_COALESCE_DELAY = 0.1
+    
+    # Seconds a monitored domain's address is reused before resolving again
+    DNS_CACHE_TTL = 60
+    
+    # Domains resolved by the live DNS monitor
+    MONITORED_DOMAINS = ('google.com', 'github.com', 'cloudflare.com', 'microsoft.com', 'youtube.com')
+    
+    # Ring buffers streamed to the dashboard row by row
+    HISTORY_KEYS = ('protection_events', 'live_dns_queries', 'network_connections', 'traffic_stats')
+    
     def __init__(self):
         self.dns_handler = None
         self.padding_handler = None
-        self.websockets = weakref.WeakSet()
+        self.websockets: set = set()
         self.stats = {
             'dns_active': False,
             'padding_active': False,
             'start_time': None,
             'dns_queries': 0,
             'dummy_packets': 0,
-            'protection_events': [],
-            'live_dns_queries': [],
-            'network_connections': [],
-            'traffic_stats': [],
+            # Ring buffers: appends evict the oldest entry once full. Sized to
+            # the rows the dashboard shows, so snapshots carry nothing it drops
+            'protection_events': deque(maxlen=20),
+            'live_dns_queries': deque(maxlen=20),
+            'network_connections': deque(maxlen=15),
+            'traffic_stats': deque(maxlen=10),
             'ip_info': {}
         }
         self.app = None
         self.monitoring_tasks = []
+        self._ip_task = None  # In-flight get_ip_information run, if any
         self.last_network_stats = None
+        self._last_net_ts = 0.0
+        self._last_connections = set()
+        self._idle_connection_scans = 0
+        self._ts_cache = (-1, '')
+        self._dns_cache = {}  # domain -> (monotonic time resolved, ip)
+        self._seq = 0  # Sequence number of the newest history row
+        self._last_sent = {}  # Scalar fields as of the last broadcast
+        self._last_sent_seq = 0
+        self._pending_broadcast = None
+        self._closing = set()  # Close handshakes of dropped clients
+        self._has_clients = asyncio.Event()
+        self._http = None  # Shared client session, open while the app runs
+        
+        # WebSocket action -> handler
+        self._actions = {
+            'start_dns': self.start_dns_protection,
+            'stop_dns': self.stop_dns_protection,
+            'start_padding': self.start_padding_protection,
+            'stop_padding': self.stop_padding_protection,
+            'start_monitoring': self.start_live_monitoring,
+            'stop_monitoring': self.stop_live_monitoring,
+            'test_dns': self.test_dns_queries,
+            'stop_all_shutdown': self.stop_all_and_prepare_shutdown
+        }
+    
+    def _ts(self) -> str:
+        """HH:MM:SS timestamp for log rows, formatted at most once per second"""
+        now = int(time.time())
+        if now != self._ts_cache[0]:
+            lt = time.localtime(now)
+            self._ts_cache = (now, f"{lt.tm_hour:02d}:{lt.tm_min:02d}:{lt.tm_sec:02d}")
+        return self._ts_cache[1]
+    
+    def _record(self, key: str, row: dict):
+        """Append a row to a history buffer, tagged with a sequence number"""
+        self._seq += 1
+        row['seq'] = self._seq
+        self.stats[key].append(row)
     
     async def websocket_handler(self, request):
         """Handle WebSocket connections"""
-        ws = web.WebSocketResponse()
+        # Per-message deflate: the snapshot and deltas repeat the same keys on
+        # every row. Clients only ever send small control messages.
+        ws = web.WebSocketResponse(
+            compress=True,
+            max_msg_size=64 * 1024,
+            heartbeat=self.HEARTBEAT_INTERVAL
+        )
         await ws.prepare(request)
         
         self.websockets.add(ws)
+        self._has_clients.set()
         logger.info("New WebSocket connection")
         
-        # Send initial status
-        await self.send_status_update(ws)
-        
-        async for msg in ws:
-            if msg.type == WSMsgType.TEXT:
-                try:
-                    data = json.loads(msg.data)
-                    await self.handle_websocket_message(data, ws)
-                except json.JSONDecodeError:
-                    pass
-            elif msg.type == WSMsgType.ERROR:
-                logger.error(f'WebSocket error: {ws.exception()}')
+        try:
+            # Send initial status
+            await self.send_status_update(ws)
+            
+            async for msg in ws:
+                if msg.type == WSMsgType.TEXT:
+                    try:
+                        data = _loads(msg.data)
+                        await self.handle_websocket_message(data, ws)
+                    except ValueError:  # Malformed JSON from either decoder
+                        pass
+                elif msg.type == WSMsgType.ERROR:
+                    logger.error(f'WebSocket error: {ws.exception()}')
+        finally:
+            self.websockets.discard(ws)
         
         logger.info("WebSocket connection closed")
         return ws
@@ -79,24 +178,14 @@ class WebMonitor:
         """Handle incoming WebSocket messages"""
         action = data.get('action')
         
-        if action == 'start_dns':
-            await self.start_dns_protection()
-        elif action == 'stop_dns':
-            await self.stop_dns_protection()
-        elif action == 'start_padding':
-            await self.start_padding_protection()
-        elif action == 'stop_padding':
-            await self.stop_padding_protection()
-        elif action == 'get_status':
+        # get_status is the only action that replies to the requesting socket
+        if action == 'get_status':
             await self.send_status_update(ws)
-        elif action == 'start_monitoring':
-            await self.start_live_monitoring()
-        elif action == 'stop_monitoring':
-            await self.stop_live_monitoring()
-        elif action == 'test_dns':
-            await self.test_dns_queries()
-        elif action == 'stop_all_shutdown':
-            await self.stop_all_and_prepare_shutdown()
+            return
+        
+        handler = self._actions.get(action)
+        if handler:
+            await handler()
     
     async def start_dns_protection(self):
         """Start DNS protection and notify clients"""
@@ -107,7 +196,7 @@ class WebMonitor:
                 self.stats['dns_active'] = True
                 self.stats['start_time'] = time.time()
                 await self.add_event("DNS-over-HTTPS protection started")
-                await self.broadcast_status()
+                self.schedule_broadcast()
         except Exception as e:
             await self.add_event(f"DNS protection failed: {e}")
     
@@ -119,7 +208,7 @@ class WebMonitor:
                 self.dns_handler = None
                 self.stats['dns_active'] = False
                 await self.add_event("DNS-over-HTTPS protection stopped")
-                await self.broadcast_status()
+                self.schedule_broadcast()
         except Exception as e:
             await self.add_event(f"DNS stop failed: {e}")
     
@@ -131,7 +220,7 @@ class WebMonitor:
                 await self.padding_handler.start()
                 self.stats['padding_active'] = True
                 await self.add_event("Traffic obfuscation started")
-                await self.broadcast_status()
+                self.schedule_broadcast()
         except Exception as e:
             await self.add_event(f"Traffic obfuscation failed: {e}")
     
@@ -143,19 +232,14 @@ class WebMonitor:
                 self.padding_handler = None
                 self.stats['padding_active'] = False
                 await self.add_event("Traffic obfuscation stopped")
-                await self.broadcast_status()
+                self.schedule_broadcast()
         except Exception as e:
             await self.add_event(f"Traffic stop failed: {e}")
     
     async def start_live_monitoring(self):
         """Start live monitoring tasks"""
         if not self.monitoring_tasks:
-            self.monitoring_tasks = [
-                asyncio.create_task(self.monitor_dns_queries()),
-                asyncio.create_task(self.monitor_network_traffic()),
-                asyncio.create_task(self.monitor_connections()),
-                asyncio.create_task(self.get_ip_information())
-            ]
+            self.monitoring_tasks = [asyncio.create_task(self.monitor_tick())]
             await self.add_event("Live monitoring started")
     
     async def stop_live_monitoring(self):
@@ -165,137 +249,187 @@ class WebMonitor:
         self.monitoring_tasks = []
         await self.add_event("Live monitoring stopped")
     
-    async def monitor_dns_queries(self):
-        """Monitor DNS queries in real-time"""
-        test_domains = ['google.com', 'github.com', 'cloudflare.com', 'microsoft.com', 'youtube.com']
+    async def monitor_tick(self):
+        """
+        Drive all live monitors from a single 1-second tick loop
         
-        while True:
-            try:
-                for domain in test_domains:
-                    try:
-                        start_time = time.time()
-                        ip_address = socket.gethostbyname(domain)
-                        response_time = round((time.time() - start_time) * 1000, 1)
-                        
-                        dns_query = {
-                            'timestamp': datetime.now().strftime("%H:%M:%S"),
-                            'domain': domain,
-                            'ip': ip_address,
-                            'response_time': response_time,
-                            'encrypted': self.stats['dns_active']
-                        }
-                        
-                        self.stats['live_dns_queries'].append(dns_query)
-                        
-                        # Keep only last 20 queries
-                        if len(self.stats['live_dns_queries']) > 20:
-                            self.stats['live_dns_queries'] = self.stats['live_dns_queries'][-20:]
-                        
-                        await asyncio.sleep(3)
-                    except Exception as e:
-                        dns_query = {
-                            'timestamp': datetime.now().strftime("%H:%M:%S"),
-                            'domain': domain,
-                            'ip': 'FAILED',
-                            'response_time': 0,
-                            'encrypted': False,
-                            'error': str(e)[:30]
-                        }
-                        self.stats['live_dns_queries'].append(dns_query)
-                
-                await asyncio.sleep(10)  # Wait before next cycle
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                await asyncio.sleep(5)
-    
-    async def monitor_network_traffic(self):
-        """Monitor network traffic statistics"""
+        Each monitor runs when its next due tick is reached: DNS every 10s
+        (one domain at a time), traffic every 2s, connections every 5s
+        (15s once idle) and IP information every 60s. The IP lookup makes
+        slow HTTP requests, so it runs as its own task and never delays
+        the other samples.
+        """
+        # Baseline for the first traffic sample
         try:
-            self.last_network_stats = psutil.net_io_counters()
-        except:
-            return
+            self.last_network_stats = psutil.net_io_counters(pernic=False)
+            self._last_net_ts = time.monotonic()
+        except Exception:
+            self.last_network_stats = None
+        
+        self._last_connections = set()
+        self._idle_connection_scans = 0
+        domains = itertools.cycle(self.MONITORED_DOMAINS)
+        
+        due = {'ip_info': 0, 'dns': 0, 'traffic': 2, 'connections': 5}
+        tick = 0
         
         while True:
             try:
-                await asyncio.sleep(2)
+                if tick >= due['ip_info']:
+                    due['ip_info'] = tick + 60
+                    if not self._ip_task or self._ip_task.done():
+                        self._ip_task = asyncio.create_task(self.get_ip_information())
                 
-                current_stats = psutil.net_io_counters()
+                if tick >= due['dns']:
+                    due['dns'] = tick + 10
+                    await self.sample_dns_query(next(domains))
                 
-                if self.last_network_stats:
-                    bytes_sent_rate = (current_stats.bytes_sent - self.last_network_stats.bytes_sent) / 2
-                    bytes_recv_rate = (current_stats.bytes_recv - self.last_network_stats.bytes_recv) / 2
-                    packets_sent_rate = (current_stats.packets_sent - self.last_network_stats.packets_sent) / 2
-                    packets_recv_rate = (current_stats.packets_recv - self.last_network_stats.packets_recv) / 2
-                    
-                    traffic_data = {
-                        'timestamp': datetime.now().strftime("%H:%M:%S"),
-                        'bytes_sent_rate': round(bytes_sent_rate),
-                        'bytes_recv_rate': round(bytes_recv_rate),
-                        'packets_sent_rate': round(packets_sent_rate, 1),
-                        'packets_recv_rate': round(packets_recv_rate, 1),
-                        'dummy_packets': self.padding_handler.get_stats()['dummy_packets_sent'] if self.padding_handler else 0
-                    }
-                    
-                    self.stats['traffic_stats'].append(traffic_data)
-                    
-                    # Keep only last 30 data points
-                    if len(self.stats['traffic_stats']) > 30:
-                        self.stats['traffic_stats'] = self.stats['traffic_stats'][-30:]
+                if tick >= due['traffic'] and self.last_network_stats:
+                    due['traffic'] = tick + 2
+                    self.sample_network_traffic()
+                
+                if tick >= due['connections']:
+                    await self.scan_connections()
+                    # Back off to a slower scan once nothing new has shown up for a while
+                    due['connections'] = tick + (15 if self._idle_connection_scans >= 3 else 5)
                 
-                self.last_network_stats = current_stats
+                await asyncio.sleep(1)
+                tick += 1
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                await asyncio.sleep(5)
+                logger.debug(f"Monitor tick error: {e}")
+                await asyncio.sleep(1)
+                tick += 1
+        
+        if self._ip_task:
+            self._ip_task.cancel()
+            self._ip_task = None
+    
+    async def _resolve(self, domain: str, timeout: float = 5.0) -> str:
+        """Resolve an IPv4 address without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        infos = await asyncio.wait_for(
+            loop.getaddrinfo(domain, None, family=socket.AF_INET, type=socket.SOCK_STREAM),
+            timeout=timeout
+        )
+        return infos[0][4][0]
     
-    async def monitor_connections(self):
-        """Monitor active network connections"""
-        last_connections = set()
+    async def sample_dns_query(self, domain: str):
+        """Resolve one monitored domain and record the result"""
+        try:
+            cached = self._dns_cache.get(domain)
+            cache_hit = cached is not None and time.monotonic() - cached[0] < self.DNS_CACHE_TTL
+            
+            if cache_hit:
+                ip_address = cached[1]
+                response = 'cached'
+            else:
+                start_time = time.time()
+                ip_address = await self._resolve(domain)
+                response = f"{round((time.time() - start_time) * 1000, 1)}ms"
+                self._dns_cache[domain] = (time.monotonic(), ip_address)
+            
+            # Display strings are formatted once here; the dashboard shows them as-is
+            dns_query = {
+                'timestamp': self._ts(),
+                'domain': domain,
+                'ip': ip_address,
+                'response': response,
+                'encrypted': self.stats['dns_active']
+            }
+        except Exception as e:
+            dns_query = {
+                'timestamp': self._ts(),
+                'domain': domain,
+                'ip': 'FAILED',
+                'response': '0ms',
+                'encrypted': False,
+                'error': str(e)[:30]
+            }
         
-        while True:
-            try:
-                await asyncio.sleep(5)
-                
-                current_connections = set()
-                connections = psutil.net_connections(kind='inet')
-                
-                for conn in connections:
-                    if conn.status == 'ESTABLISHED' and conn.raddr:
-                        conn_str = f"{conn.laddr.ip}:{conn.laddr.port} -> {conn.raddr.ip}:{conn.raddr.port}"
-                        current_connections.add(conn_str)
-                        
-                        # Show new connections
-                        if conn_str not in last_connections:
-                            connection_data = {
-                                'timestamp': datetime.now().strftime("%H:%M:%S"),
-                                'local': f"{conn.laddr.ip}:{conn.laddr.port}",
-                                'remote': f"{conn.raddr.ip}:{conn.raddr.port}",
-                                'protocol': 'TCP' if conn.type == socket.SOCK_STREAM else 'UDP',
-                                'status': 'NEW'
-                            }
-                            
-                            self.stats['network_connections'].append(connection_data)
-                            
-                            # Keep only last 15 connections
-                            if len(self.stats['network_connections']) > 15:
-                                self.stats['network_connections'] = self.stats['network_connections'][-15:]
-                
-                last_connections = current_connections
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                await asyncio.sleep(5)
+        self._record('live_dns_queries', dns_query)
+    
+    def sample_network_traffic(self):
+        """Record traffic rates since the previous sample"""
+        try:
+            current_stats = psutil.net_io_counters(pernic=False)
+        except Exception as e:
+            logger.debug(f"Traffic sample failed: {e}")
+            return
+        
+        now = time.monotonic()
+        last = self.last_network_stats
+        
+        # Divide by the real elapsed time; the tick can overrun under load
+        dt = now - self._last_net_ts
+        
+        if last and dt > 0:
+            # Unpack only the four counters used, once per sample
+            bytes_sent, bytes_recv, packets_sent, packets_recv = current_stats[:4]
+            bytes_sent_rate = (bytes_sent - last.bytes_sent) / dt
+            bytes_recv_rate = (bytes_recv - last.bytes_recv) / dt
+            packets_sent_rate = (packets_sent - last.packets_sent) / dt
+            packets_recv_rate = (packets_recv - last.packets_recv) / dt
+            
+            traffic_data = {
+                'timestamp': self._ts(),
+                'bytes_sent_rate': round(bytes_sent_rate),
+                'bytes_recv_rate': round(bytes_recv_rate),
+                'packets_sent_rate': round(packets_sent_rate, 1),
+                'packets_recv_rate': round(packets_recv_rate, 1),
+                # Read the one counter directly rather than copying all padding stats
+                'dummy_packets': self.padding_handler.stats['dummy_packets_sent'] if self.padding_handler else 0
+            }
+            
+            self._record('traffic_stats', traffic_data)
+        
+        self.last_network_stats = current_stats
+        self._last_net_ts = now
+    
+    async def scan_connections(self):
+        """Record established connections not seen in the previous scan"""
+        try:
+            # Walking the system socket table scales with the number of open
+            # sockets, so it runs in a worker thread rather than on the loop
+            loop = asyncio.get_running_loop()
+            connections = await loop.run_in_executor(None, psutil.net_connections, 'inet')
+            
+            # Raw (laddr, raddr, type) tuples; strings are only built for new entries
+            current_connections = {
+                (conn.laddr, conn.raddr, conn.type)
+                for conn in connections
+                if conn.status == 'ESTABLISHED' and conn.raddr
+            }
+        except Exception as e:
+            logger.debug(f"Connection scan failed: {e}")
+            return
+        
+        new_connections = current_connections - self._last_connections
+        self._idle_connection_scans = 0 if new_connections else self._idle_connection_scans + 1
+        
+        # Show new connections
+        for laddr, raddr, conn_type in new_connections:
+            connection_data = {
+                'timestamp': self._ts(),
+                'local': f"{laddr.ip}:{laddr.port}",
+                'remote': f"{raddr.ip}:{raddr.port}",
+                'protocol': 'TCP' if conn_type == socket.SOCK_STREAM else 'UDP',
+                'status': 'NEW'
+            }
+            
+            self._record('network_connections', connection_data)
+        
+        self._last_connections = current_connections
     
     async def get_ip_information(self):
         """Get current IP and network information"""
         try:
             # Get network interfaces
             interfaces = []
-            net_if_addrs = psutil.net_if_addrs()
+            loop = asyncio.get_running_loop()
+            net_if_addrs = await loop.run_in_executor(None, psutil.net_if_addrs)
             
             for interface_name, addresses in net_if_addrs.items():
                 if 'Loopback' not in interface_name:
@@ -310,30 +444,32 @@ class WebMonitor:
             
             # Try to get public IP
             try:
-                import aiohttp
-                async with aiohttp.ClientSession() as session:
-                    async with session.get('https://api.ipify.org?format=json', timeout=10) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            public_ip = data['ip']
-                            
-                            # Get location info
-                            try:
-                                async with session.get(f'http://ip-api.com/json/{public_ip}', timeout=10) as geo_response:
-                                    if geo_response.status == 200:
-                                        geo_data = await geo_response.json()
-                                        self.stats['ip_info'] = {
-                                            'public_ip': public_ip,
-                                            'city': geo_data.get('city', 'Unknown'),
-                                            'country': geo_data.get('country', 'Unknown'),
-                                            'isp': geo_data.get('isp', 'Unknown'),
-                                            'interfaces': interfaces
-                                        }
-                            except:
-                                self.stats['ip_info'] = {
-                                    'public_ip': public_ip,
-                                    'interfaces': interfaces
-                                }
+                session = self._http
+                if session is None:
+                    raise RuntimeError("HTTP session not started")
+                
+                async with session.get('https://api.ipify.org?format=json', timeout=10) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        public_ip = data['ip']
+                        
+                        # Get location info
+                        try:
+                            async with session.get(f'http://ip-api.com/json/{public_ip}', timeout=10) as geo_response:
+                                if geo_response.status == 200:
+                                    geo_data = await geo_response.json()
+                                    self.stats['ip_info'] = {
+                                        'public_ip': public_ip,
+                                        'city': geo_data.get('city', 'Unknown'),
+                                        'country': geo_data.get('country', 'Unknown'),
+                                        'isp': geo_data.get('isp', 'Unknown'),
+                                        'interfaces': interfaces
+                                    }
+                        except:
+                            self.stats['ip_info'] = {
+                                'public_ip': public_ip,
+                                'interfaces': interfaces
+                            }
             except:
                 self.stats['ip_info'] = {'interfaces': interfaces}
                 
@@ -347,7 +483,7 @@ class WebMonitor:
         for domain in test_domains:
             try:
                 start_time = time.time()
-                ip_address = socket.gethostbyname(domain)
+                ip_address = await self._resolve(domain)
                 response_time = round((time.time() - start_time) * 1000, 1)
                 
                 await self.add_event(f"DNS test: {domain} -> {ip_address} ({response_time}ms)")
@@ -376,16 +512,12 @@ class WebMonitor:
             await self.broadcast_status()
             
             # Send shutdown signal to clients
-            shutdown_message = json.dumps({
+            shutdown_message = _dumps({
                 'type': 'shutdown_ready',
                 'message': 'All protections stopped. Terminal can be safely closed.'
             })
             
-            for ws in list(self.websockets):
-                try:
-                    await ws.send_str(shutdown_message)
-                except:
-                    pass
+            await self._send_to_all(shutdown_message)
             
         except Exception as e:
             await self.add_event(f"Shutdown preparation error: {e}")
@@ -393,47 +525,84 @@ class WebMonitor:
     async def add_event(self, message):
         """Add event to log"""
         event = {
-            'timestamp': datetime.now().strftime("%H:%M:%S"),
+            'timestamp': self._ts(),
             'message': message
         }
-        self.stats['protection_events'].append(event)
-        
-        # Keep only last 20 events
-        if len(self.stats['protection_events']) > 20:
-            self.stats['protection_events'] = self.stats['protection_events'][-20:]
-        """Add event to log"""
-        event = {
-            'timestamp': datetime.now().strftime("%H:%M:%S"),
-            'message': message
+        self._record('protection_events', event)
+    
+    def _scalar_stats(self) -> dict:
+        """Dashboard fields other than the history buffers"""
+        stats = self.stats
+        scalars = {
+            'dns_active': stats['dns_active'],
+            'padding_active': stats['padding_active'],
+            'uptime': int(time.time() - stats['start_time']) if stats['start_time'] else 0,
+            'ip_info': stats['ip_info'],
+            'dummy_packets_sent': 0,
+            'packets_padded': 0,
+            'bytes_added': 0
         }
-        self.stats['protection_events'].append(event)
         
-        # Keep only last 20 events
-        if len(self.stats['protection_events']) > 20:
-            self.stats['protection_events'] = self.stats['protection_events'][-20:]
+        # Add real-time data
+        if self.padding_handler and stats['padding_active']:
+            padding_stats = self.padding_handler.stats
+            scalars['dummy_packets_sent'] = padding_stats['dummy_packets_sent']
+            scalars['packets_padded'] = padding_stats['packets_padded']
+            scalars['bytes_added'] = padding_stats['bytes_added']
+        
+        return scalars
     
     async def get_current_stats(self):
-        """Get current protection statistics"""
-        current_stats = self.stats.copy()
-        
-        # Add real-time data
-        if self.padding_handler and self.stats['padding_active']:
-            padding_stats = self.padding_handler.get_stats()
-            current_stats.update(padding_stats)
+        """
+        Get current protection statistics
         
-        # Calculate uptime
-        if self.stats['start_time']:
-            current_stats['uptime'] = int(time.time() - self.stats['start_time'])
-        else:
-            current_stats['uptime'] = 0
+        Builds a fresh dict holding only the fields the dashboard renders.
+        History buffers are copied into lists here, within one event-loop
+        step, so monitors appending later cannot change the snapshot while
+        it is being serialized.
+        """
+        current_stats = self._scalar_stats()
+        for key in self.HISTORY_KEYS:
+            current_stats[key] = list(self.stats[key])
         
         return current_stats
     
+    def _status_delta(self):
+        """
+        Changes since the previous broadcast
+        
+        Returns (changed, appended): the scalar fields whose value differs
+        from the last broadcast, and per history buffer the rows appended
+        since then. Either may be empty.
+        """
+        scalars = self._scalar_stats()
+        last_sent = self._last_sent
+        changed = {
+            key: value for key, value in scalars.items()
+            if key not in last_sent or last_sent[key] != value
+        }
+        
+        # Walk each buffer back from the newest row; only new rows are visited
+        appended = {}
+        for key in self.HISTORY_KEYS:
+            rows = []
+            for row in reversed(self.stats[key]):
+                if row['seq'] <= self._last_sent_seq:
+                    break
+                rows.append(row)
+            if rows:
+                rows.reverse()
+                appended[key] = rows
+        
+        self._last_sent = scalars
+        self._last_sent_seq = self._seq
+        return changed, appended
+    
     async def send_status_update(self, ws):
         """Send status update to specific WebSocket"""
         try:
             stats = await self.get_current_stats()
-            await ws.send_str(json.dumps({
+            await ws.send_bytes(_dumps({
                 'type': 'status_update',
                 'data': stats
             }))
@@ -441,43 +610,232 @@ class WebMonitor:
             logger.error(f"Failed to send status update: {e}")
     
     async def broadcast_status(self):
-        """Broadcast status to all connected WebSockets"""
+        """
+        Broadcast status changes to all connected WebSockets
+        
+        Clients get the full snapshot once on connect, then only changed
+        fields and newly appended rows. Rows carry their sequence number so
+        a client can drop any it already received in its snapshot.
+        """
         if not self.websockets:
             return
         
-        stats = await self.get_current_stats()
-        message = json.dumps({
-            'type': 'status_update', 
-            'data': stats
-        })
+        changed, appended = self._status_delta()
         
-        # Send to all connected clients
-        disconnected = []
-        for ws in self.websockets:
-            try:
-                await ws.send_str(message)
-            except Exception:
-                disconnected.append(ws)
+        # Skip serialization and fan-out when nothing visible has changed
+        if not changed and not appended:
+            return
         
-        # Remove disconnected websockets
-        for ws in disconnected:
-            try:
-                self.websockets.discard(ws)
-            except:
-                pass
+        message = _dumps({
+            'type': 'status_delta',
+            'changed': changed,
+            'appended': appended
+        })
+        
+        await self._send_to_all(message)
+    
+    def schedule_broadcast(self):
+        """Broadcast soon, merging with any other broadcast requested meanwhile"""
+        if self._pending_broadcast is None:
+            self._pending_broadcast = asyncio.create_task(self._delayed_broadcast())
+    
+    async def _delayed_broadcast(self):
+        """Send one delta covering every change made during the coalesce delay"""
+        try:
+            await asyncio.sleep(self.BROADCAST_COALESCE_DELAY)
+        finally:
+            self._pending_broadcast = None
+        await self.broadcast_status()
+    
+    async def _send_to_all(self, payload: bytes):
+        """Send one encoded payload to every connected WebSocket"""
+        # Send concurrently, in batches so a large fan-out yields to the
+        # event loop between groups
+        clients = list(self.websockets)
+        for i in range(0, len(clients), self.BROADCAST_BATCH_SIZE):
+            batch = clients[i:i + self.BROADCAST_BATCH_SIZE]
+            # send_bytes waits for the write buffer to drain, so a client that
+            # stops reading runs into the timeout instead of stalling the rest
+            results = await asyncio.gather(
+                *(asyncio.wait_for(ws.send_bytes(payload), self.SEND_TIMEOUT) for ws in batch),
+                return_exceptions=True
+            )
+            
+            # Remove disconnected and slow websockets
+            for ws, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    self._drop_client(ws)
+            
+            if i + self.BROADCAST_BATCH_SIZE < len(clients):
+                await asyncio.sleep(0)
+    
+    def _drop_client(self, ws):
+        """Stop broadcasting to a client and close it in the background"""
+        self.websockets.discard(ws)
+        if not ws.closed:
+            task = asyncio.create_task(ws.close())
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
     
     async def periodic_updates(self):
         """Send periodic status updates"""
         while True:
             try:
-                await asyncio.sleep(2)  # Update every 2 seconds
+                # Sleep until a dashboard connects instead of ticking for nobody
+                if not self.websockets:
+                    self._has_clients.clear()
+                    await self._has_clients.wait()
+                
+                # Update less often while the host is busy
+                busy = psutil.cpu_percent(interval=None) > self.BUSY_CPU_PERCENT
+                await asyncio.sleep(self.BUSY_UPDATE_INTERVAL if busy else self.UPDATE_INTERVAL)
                 await self.broadcast_status()
             except Exception as e:
                 logger.error(f"Periodic update error: {e}")
     
     async def index_handler(self, request):
         """Serve the main dashboard page"""
-        html = """
+        # Serve the copy compressed at import when the browser accepts it
+        use_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+        etag = _INDEX_ETAG_GZIP if use_gzip else _INDEX_ETAG
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+        
+        if etag in request.headers.get('If-None-Match', ''):
+            return web.Response(status=304, headers=headers)
+        
+        if use_gzip:
+            body = _INDEX_HTML_GZIP
+            headers['Content-Encoding'] = 'gzip'
+        else:
+            body = _INDEX_HTML_BYTES
+        
+        return web.Response(
+            body=body,
+            content_type='text/html',
+            charset='utf-8',
+            headers=headers
+        )
+    
+    async def _on_startup(self, app):
+        """Open the shared HTTP client session"""
+        self._http = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=10)
+        )
+    
+    async def _on_cleanup(self, app):
+        """Close the shared HTTP client session"""
+        if self._http:
+            await self._http.close()
+            self._http = None
+    
+    async def create_app(self):
+        """Create the web application"""
+        app = web.Application()
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+        
+        # Add routes
+        app.router.add_get('/', self.index_handler)
+        app.router.add_get('/ws', self.websocket_handler)
+        
+        # Setup CORS
+        cors = aiohttp_cors.setup(app, defaults={
+            "*": aiohttp_cors.ResourceOptions(
+                allow_credentials=True,
+                expose_headers="*",
+                allow_headers="*",
+                allow_methods="*"
+            )
+        })
+        
+        # Add CORS to all routes
+        for route in list(app.router.routes()):
+            cors.add(route)
+        
+        return app
+    
+    async def run_server(self, host='localhost', port=8080):
+        """Run the web server"""
+        self.app = await self.create_app()
+        
+        # Start periodic updates task
+        asyncio.create_task(self.periodic_updates())
+        
+        runner = web.AppRunner(self.app)
+        await runner.setup()
+        
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        
+        print(f"🌐 Web monitor started at http://{host}:{port}")
+        print("🔍 Open this URL in your browser to see real-time protection status")
+        print("🚨 IMPORTANT: When you're done, use the STOP buttons in web interface first!")
+        print("🚨 Then press Ctrl+C to safely shutdown and restore system settings")
+        print("Press Ctrl+C to stop")
+        
+        # Keep the server running until SIGINT/SIGTERM
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError:  # Windows; Ctrl+C still interrupts the wait
+                pass
+        
+        try:
+            await stop.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            print("\n🛑 Stopping web monitor...")
+            await self.cleanup()
+            await runner.cleanup()
+    
+    async def cleanup(self):
+        """Clean up resources and restore system settings"""
+        try:
+            print("\n🛑 Cleaning up and restoring system settings...")
+            
+            # Stop all monitoring tasks first
+            for task in self.monitoring_tasks:
+                task.cancel()
+            self.monitoring_tasks = []
+            
+            # Stop protection handlers and restore settings
+            if self.dns_handler:
+                print("🌐 Stopping DNS protection and restoring DNS settings...")
+                await self.dns_handler.stop()
+                self.dns_handler = None
+                print("✅ DNS settings restored")
+                
+            if self.padding_handler:
+                print("📦 Stopping traffic obfuscation...")
+                await self.padding_handler.stop()
+                self.padding_handler = None
+                print("✅ Traffic obfuscation stopped")
+            
+            # Notify all connected clients about shutdown
+            if self.websockets:
+                shutdown_message = _dumps({
+                    'type': 'shutdown',
+                    'message': 'Server shutting down - all protections stopped'
+                })
+                
+                clients = list(self.websockets)
+                await self._send_to_all(shutdown_message)
+                await asyncio.gather(*(ws.close() for ws in clients), return_exceptions=True)
+            
+            print("✅ All protections stopped and system restored to normal")
+            print("✅ Safe to close terminal")
+            
+        except Exception as e:
+            logger.error(f"Cleanup error: {e}")
+            print(f"⚠️  Cleanup error: {e}")
+            print("🔧 Manual cleanup may be required")
+
+# Dashboard page; static, so it is encoded and fingerprinted once at import
+_INDEX_HTML = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -554,14 +912,14 @@ class WebMonitor:
             <p>Real-time monitoring of DNS encryption and traffic obfuscation</p>
         </div>
         
-        <div class="controls">
-            <button class="btn btn-start" onclick="startDNS()">🌐 Start DNS Protection</button>
-            <button class="btn btn-stop" onclick="stopDNS()">⏹️ Stop DNS Protection</button>
-            <button class="btn btn-start" onclick="startPadding()">📦 Start Traffic Obfuscation</button>
-            <button class="btn btn-stop" onclick="stopPadding()">⏹️ Stop Traffic Obfuscation</button>
-            <button class="btn btn-start" onclick="startMonitoring()">👁️ Start Live Monitoring</button>
-            <button class="btn btn-stop" onclick="stopMonitoring()">⏹️ Stop Monitoring</button>
-            <button class="btn btn-stop" onclick="stopAllAndShutdown()" style="background: #cc0000; margin-left: 20px;">🛑 Stop All & Safe Shutdown</button>
+        <div class="controls" id="controls">
+            <button class="btn btn-start" data-action="start_dns">🌐 Start DNS Protection</button>
+            <button class="btn btn-stop" data-action="stop_dns">⏹️ Stop DNS Protection</button>
+            <button class="btn btn-start" data-action="start_padding">📦 Start Traffic Obfuscation</button>
+            <button class="btn btn-stop" data-action="stop_padding">⏹️ Stop Traffic Obfuscation</button>
+            <button class="btn btn-start" data-action="start_monitoring">👁️ Start Live Monitoring</button>
+            <button class="btn btn-stop" data-action="stop_monitoring">⏹️ Stop Monitoring</button>
+            <button class="btn btn-stop" data-action="stop_all_shutdown" data-confirm="⚠️ This will stop ALL protections and prepare for safe shutdown. Continue?" style="background: #cc0000; margin-left: 20px;">🛑 Stop All & Safe Shutdown</button>
         </div>
         
         <div class="status-grid">
@@ -680,7 +1038,15 @@ class WebMonitor:
         <div class="status-card">
             <h3>🌍 IP & Network Information</h3>
             <div id="ip-info">
-                <p>Loading network information...</p>
+                <p id="ip-placeholder">Loading network information...</p>
+                <p hidden><strong>🌍 Public IP:</strong> <span id="ip-public"></span></p>
+                <p hidden><strong>📍 Location:</strong> <span id="ip-location"></span></p>
+                <p hidden><strong>🏢 ISP:</strong> <span id="ip-isp"></span></p>
+                <div id="ip-ifaces-section" hidden>
+                    <p><strong>🔌 Network Interfaces:</strong></p>
+                    <div id="ip-ifaces"></div>
+                </div>
+                <p hidden>❌ Error: <span id="ip-error"></span></p>
             </div>
         </div>
     </div>
@@ -691,27 +1057,36 @@ class WebMonitor:
     
     <script>
         let ws = null;
+        let reconnectDelay = 1000;  // Doubles per failed attempt, capped at 30s
+        const decoder = new TextDecoder();
+        let pendingUpdates = [];  // Status messages waiting for the next frame
+        const MAX_PENDING_UPDATES = 200;
         
         function connect() {
             const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
             ws = new WebSocket(`${protocol}//${window.location.host}/ws`);
+            ws.binaryType = 'arraybuffer';  // Status payloads arrive as UTF-8 JSON bytes
             
             ws.onopen = function() {
                 document.getElementById('connection-status').className = 'connection-status connected';
                 document.getElementById('connection-status').textContent = 'Connected';
                 ws.send(JSON.stringify({action: 'get_status'}));
+                reconnectDelay = 1000;
             };
             
             ws.onclose = function() {
                 document.getElementById('connection-status').className = 'connection-status disconnected';
                 document.getElementById('connection-status').textContent = 'Disconnected';
-                setTimeout(connect, 2000); // Reconnect after 2 seconds
+                // Exponential back-off with jitter so reloaded servers are not hit by every tab at once
+                setTimeout(connect, reconnectDelay * (0.5 + Math.random() / 2));
+                reconnectDelay = Math.min(reconnectDelay * 2, 30000);
             };
             
             ws.onmessage = function(event) {
-                const message = JSON.parse(event.data);
-                if (message.type === 'status_update') {
-                    updateStatus(message.data);
+                const text = typeof event.data === 'string' ? event.data : decoder.decode(event.data);
+                const message = JSON.parse(text);
+                if (message.type === 'status_update' || message.type === 'status_delta') {
+                    queueUpdate(message);
                 } else if (message.type === 'shutdown') {
                     // Handle server shutdown
                     document.getElementById('connection-status').className = 'connection-status disconnected';
@@ -723,292 +1098,320 @@ class WebMonitor:
             };
         }
         
+        function queueUpdate(message) {
+            // Apply status messages at most once per frame
+            if (message.type === 'status_update') {
+                // A snapshot supersedes everything queued before it
+                pendingUpdates = [];
+            } else if (pendingUpdates.length >= MAX_PENDING_UPDATES) {
+                // Hidden tabs get no frames; resync from a snapshot instead
+                // of replaying a long backlog of deltas
+                pendingUpdates = [];
+                ws.send(JSON.stringify({action: 'get_status'}));
+                return;
+            }
+            pendingUpdates.push(message);
+            if (pendingUpdates.length === 1) {
+                requestAnimationFrame(flushUpdates);
+            }
+        }
+        
+        function flushUpdates() {
+            const messages = pendingUpdates;
+            pendingUpdates = [];
+            messages.forEach(message => {
+                if (message.type === 'status_update') {
+                    updateStatus(message.data);
+                } else {
+                    updateIndicators(message.changed);
+                    for (const key in message.appended) {
+                        appendRows(key, message.appended[key]);
+                    }
+                }
+            });
+        }
+        
+        // History lists: element id, rows kept on screen, row factory, the
+        // rendered row element for each row key, and detached rows for reuse
+        const LISTS = {
+            protection_events: {id: 'events-list', max: 20, render: eventRow, nodes: new Map(), pool: []},
+            live_dns_queries: {id: 'dns-queries-list', max: 20, render: dnsRow, nodes: new Map(), pool: []},
+            traffic_stats: {id: 'traffic-stats-list', max: 10, render: trafficRow, nodes: new Map(), pool: []},
+            network_connections: {id: 'connections-list', max: 15, render: connectionRow, nodes: new Map(), pool: []}
+        };
+        const lastSeq = {};  // Newest row sequence number shown per list
+        
+        function rowKey(row) {
+            // The timestamp guards against reused sequence numbers after a server restart
+            return row.seq + '@' + row.timestamp;
+        }
+        
         function updateStatus(data) {
+            // Full snapshot, sent once when the socket connects
+            updateIndicators(data);
+            for (const key in LISTS) {
+                reconcileRows(key, data[key] || []);
+            }
+        }
+        
+        function reconcileRows(key, rows) {
+            // Keyed diff against the rows on screen: rows still present keep
+            // their element, so a reconnect only touches what actually changed
+            const list = LISTS[key];
+            const listEl = document.getElementById(list.id);
+            rows = rows.slice(-list.max);
+            const wanted = new Set(rows.map(rowKey));
+            
+            // Stale rows, including the static placeholder row
+            const stale = Array.from(listEl.children).filter(child => !wanted.has(child.dataset.key));
+            stale.forEach(child => releaseRow(list, child));
+            
+            const frag = document.createDocumentFragment();
+            if (stale.length === listEl.childElementCount) {
+                // Nothing on screen survives (first snapshot, or the server
+                // restarted): swap the whole list in a single operation
+                rows.forEach(row => frag.appendChild(keyedRow(list, row)));
+                listEl.replaceChildren(frag);
+                lastSeq[key] = rows.length ? rows[rows.length - 1].seq : 0;
+                return;
+            }
+            stale.forEach(child => listEl.removeChild(child));
+            
+            // Insert new rows and fix ordering in one forward pass; rows that
+            // go before the same existing row are inserted as one fragment
+            let cursor = listEl.firstElementChild;
+            rows.forEach(row => {
+                const node = list.nodes.get(rowKey(row)) || keyedRow(list, row);
+                if (node === cursor) {
+                    listEl.insertBefore(frag, cursor);
+                    cursor = cursor.nextElementSibling;
+                } else {
+                    frag.appendChild(node);
+                }
+            });
+            listEl.insertBefore(frag, cursor);
+            
+            lastSeq[key] = rows.length ? rows[rows.length - 1].seq : 0;
+        }
+        
+        function keyedRow(list, row) {
+            // Render a row, into a recycled element when the pool has one,
+            // and register it under the row key
+            const node = list.render(row, list.pool.pop());
+            node.dataset.key = rowKey(row);
+            list.nodes.set(node.dataset.key, node);
+            return node;
+        }
+        
+        function updateIndicators(changed) {
             // Update DNS status
-            const dnsIndicator = document.getElementById('dns-indicator');
-            const dnsStatus = document.getElementById('dns-status');
-            if (data.dns_active) {
-                dnsIndicator.className = 'status-indicator status-active';
-                dnsStatus.textContent = 'Active - DNS queries encrypted';
-            } else {
-                dnsIndicator.className = 'status-indicator status-inactive';
-                dnsStatus.textContent = 'Inactive';
+            if ('dns_active' in changed) {
+                const dnsIndicator = document.getElementById('dns-indicator');
+                const dnsStatus = document.getElementById('dns-status');
+                if (changed.dns_active) {
+                    dnsIndicator.className = 'status-indicator status-active';
+                    dnsStatus.textContent = 'Active - DNS queries encrypted';
+                } else {
+                    dnsIndicator.className = 'status-indicator status-inactive';
+                    dnsStatus.textContent = 'Inactive';
+                }
             }
             
             // Update padding status
-            const paddingIndicator = document.getElementById('padding-indicator');
-            const paddingStatus = document.getElementById('padding-status');
-            if (data.padding_active) {
-                paddingIndicator.className = 'status-indicator status-active';
-                paddingStatus.textContent = 'Active - Traffic obfuscated';
-            } else {
-                paddingIndicator.className = 'status-indicator status-inactive';
-                paddingStatus.textContent = 'Inactive';
+            if ('padding_active' in changed) {
+                const paddingIndicator = document.getElementById('padding-indicator');
+                const paddingStatus = document.getElementById('padding-status');
+                if (changed.padding_active) {
+                    paddingIndicator.className = 'status-indicator status-active';
+                    paddingStatus.textContent = 'Active - Traffic obfuscated';
+                } else {
+                    paddingIndicator.className = 'status-indicator status-inactive';
+                    paddingStatus.textContent = 'Inactive';
+                }
             }
             
             // Update stats
-            document.getElementById('uptime').textContent = data.uptime || 0;
-            document.getElementById('dummy-packets').textContent = data.dummy_packets_sent || 0;
-            document.getElementById('padded-packets').textContent = data.packets_padded || 0;
-            document.getElementById('bytes-added').textContent = data.bytes_added || 0;
-            
-            // Update events
-            if (data.protection_events) {
-                const eventsList = document.getElementById('events-list');
-                eventsList.innerHTML = '';
-                data.protection_events.forEach(event => {
-                    const eventDiv = document.createElement('div');
-                    eventDiv.className = 'event';
-                    eventDiv.innerHTML = `<span class="timestamp">${event.timestamp}</span><span>${event.message}</span>`;
-                    eventsList.appendChild(eventDiv);
-                });
+            if ('uptime' in changed) {
+                document.getElementById('uptime').textContent = changed.uptime || 0;
             }
-            
-            // Update DNS queries
-            if (data.live_dns_queries) {
-                const dnsQueriesList = document.getElementById('dns-queries-list');
-                dnsQueriesList.innerHTML = '';
-                data.live_dns_queries.forEach(query => {
-                    const queryDiv = document.createElement('div');
-                    queryDiv.className = 'dns-row';
-                    const statusClass = query.encrypted ? 'encrypted' : (query.ip === 'FAILED' ? 'failed' : 'unencrypted');
-                    const statusText = query.encrypted ? '🔒 ENC' : (query.ip === 'FAILED' ? '❌ FAIL' : '❌ RAW');
-                    queryDiv.innerHTML = `
-                        <span>${query.timestamp}</span>
-                        <span>${query.domain}</span>
-                        <span>${query.ip}</span>
-                        <span>${query.response_time}ms</span>
-                        <span class="${statusClass}">${statusText}</span>
-                    `;
-                    dnsQueriesList.appendChild(queryDiv);
-                });
+            if ('dummy_packets_sent' in changed) {
+                document.getElementById('dummy-packets').textContent = changed.dummy_packets_sent || 0;
             }
-            
-            // Update traffic stats
-            if (data.traffic_stats) {
-                const trafficStatsList = document.getElementById('traffic-stats-list');
-                trafficStatsList.innerHTML = '';
-                data.traffic_stats.slice(-10).forEach(stat => {
-                    const statDiv = document.createElement('div');
-                    statDiv.className = 'traffic-row';
-                    statDiv.innerHTML = `
-                        <span>${stat.timestamp}</span>
-                        <span>${stat.bytes_sent_rate}</span>
-                        <span>${stat.bytes_recv_rate}</span>
-                        <span>${stat.packets_sent_rate}</span>
-                        <span class="encrypted">${stat.dummy_packets}</span>
-                    `;
-                    trafficStatsList.appendChild(statDiv);
-                });
+            if ('packets_padded' in changed) {
+                document.getElementById('padded-packets').textContent = changed.packets_padded || 0;
             }
-            
-            // Update network connections
-            if (data.network_connections) {
-                const connectionsList = document.getElementById('connections-list');
-                connectionsList.innerHTML = '';
-                data.network_connections.forEach(conn => {
-                    const connDiv = document.createElement('div');
-                    connDiv.className = 'connection-row';
-                    connDiv.innerHTML = `
-                        <span>${conn.timestamp}</span>
-                        <span>${conn.local}</span>
-                        <span>${conn.remote}</span>
-                        <span>${conn.protocol}</span>
-                        <span class="encrypted">${conn.status}</span>
-                    `;
-                    connectionsList.appendChild(connDiv);
-                });
+            if ('bytes_added' in changed) {
+                document.getElementById('bytes-added').textContent = changed.bytes_added || 0;
             }
             
-            // Update IP information
-            if (data.ip_info) {
-                const ipInfo = document.getElementById('ip-info');
-                let html = '';
-                
-                if (data.ip_info.public_ip) {
-                    html += `<p><strong>🌍 Public IP:</strong> ${data.ip_info.public_ip}</p>`;
-                }
-                if (data.ip_info.city && data.ip_info.country) {
-                    html += `<p><strong>📍 Location:</strong> ${data.ip_info.city}, ${data.ip_info.country}</p>`;
-                }
-                if (data.ip_info.isp) {
-                    html += `<p><strong>🏢 ISP:</strong> ${data.ip_info.isp}</p>`;
-                }
-                
-                if (data.ip_info.interfaces) {
-                    html += '<p><strong>🔌 Network Interfaces:</strong></p>';
-                    data.ip_info.interfaces.forEach(iface => {
-                        html += `<p style="margin-left: 20px;"><strong>${iface.name}:</strong><br>`;
-                        iface.addresses.forEach(addr => {
-                            html += `&nbsp;&nbsp;${addr}<br>`;
-                        });
-                        html += '</p>';
-                    });
-                }
-                
-                if (data.ip_info.error) {
-                    html = `<p>❌ Error: ${data.ip_info.error}</p>`;
-                }
-                
-                ipInfo.innerHTML = html || '<p>No IP information available</p>';
+            if (changed.ip_info) {
+                updateIpInfo(changed.ip_info);
             }
         }
         
-        function startDNS() {
-            if (ws && ws.readyState === WebSocket.OPEN) {
-                ws.send(JSON.stringify({action: 'start_dns'}));
+        function appendRows(key, rows) {
+            const list = LISTS[key];
+            const listEl = document.getElementById(list.id);
+            // Skip rows already shown from the connect snapshot
+            const fresh = rows.filter(row => row.seq > lastSeq[key]).slice(-list.max);
+            if (!fresh.length) {
+                return;
             }
+            lastSeq[key] = fresh[fresh.length - 1].seq;
+            
+            // Trim first so the rows pushed out can be reused for the new ones
+            trimExcess(list, listEl, list.max - fresh.length);
+            const frag = document.createDocumentFragment();
+            fresh.forEach(row => frag.appendChild(keyedRow(list, row)));
+            listEl.appendChild(frag);
         }
         
-        function stopDNS() {
-            if (ws && ws.readyState === WebSocket.OPEN) {
-                ws.send(JSON.stringify({action: 'stop_dns'}));
+        function trimExcess(list, listEl, max) {
+            // Oldest rows are at the top
+            while (listEl.childElementCount > max) {
+                const oldest = listEl.firstElementChild;
+                listEl.removeChild(oldest);
+                releaseRow(list, oldest);
             }
         }
         
-        function startPadding() {
-            if (ws && ws.readyState === WebSocket.OPEN) {
-                ws.send(JSON.stringify({action: 'start_padding'}));
+        function releaseRow(list, node) {
+            // Keep a detached row for reuse; the static placeholder rows have no cells
+            list.nodes.delete(node.dataset.key);
+            if (node.cells && list.pool.length < list.max) {
+                list.pool.push(node);
             }
         }
         
-        function stopPadding() {
-            if (ws && ws.readyState === WebSocket.OPEN) {
-                ws.send(JSON.stringify({action: 'stop_padding'}));
-            }
+        function makeRow(className, cellClasses) {
+            // Row element with one span per column, kept on row.cells so
+            // renderers fill them with textContent; no HTML parsing per row
+            const rowDiv = document.createElement('div');
+            rowDiv.className = className;
+            rowDiv.cells = cellClasses.map(cellClass => {
+                const span = document.createElement('span');
+                span.className = cellClass;
+                rowDiv.appendChild(span);
+                return span;
+            });
+            return rowDiv;
         }
         
-        function startMonitoring() {
-            if (ws && ws.readyState === WebSocket.OPEN) {
-                ws.send(JSON.stringify({action: 'start_monitoring'}));
-            }
+        function eventRow(event, node) {
+            const eventDiv = node || makeRow('event', ['timestamp', '']);
+            eventDiv.cells[0].textContent = event.timestamp;
+            eventDiv.cells[1].textContent = event.message;
+            return eventDiv;
         }
         
-        function stopMonitoring() {
-            if (ws && ws.readyState === WebSocket.OPEN) {
-                ws.send(JSON.stringify({action: 'stop_monitoring'}));
-            }
+        function dnsRow(query, node) {
+            const queryDiv = node || makeRow('dns-row', ['', '', '', '', '']);
+            const cells = queryDiv.cells;
+            cells[0].textContent = query.timestamp;
+            cells[1].textContent = query.domain;
+            cells[2].textContent = query.ip;
+            cells[3].textContent = query.response;
+            cells[4].className = query.encrypted ? 'encrypted' : (query.ip === 'FAILED' ? 'failed' : 'unencrypted');
+            cells[4].textContent = query.encrypted ? '🔒 ENC' : (query.ip === 'FAILED' ? '❌ FAIL' : '❌ RAW');
+            return queryDiv;
         }
         
-        function testDNS() {
-            if (ws && ws.readyState === WebSocket.OPEN) {
-                ws.send(JSON.stringify({action: 'test_dns'}));
+        function trafficRow(stat, node) {
+            const statDiv = node || makeRow('traffic-row', ['', '', '', '', 'encrypted']);
+            const cells = statDiv.cells;
+            cells[0].textContent = stat.timestamp;
+            cells[1].textContent = stat.bytes_sent_rate;
+            cells[2].textContent = stat.bytes_recv_rate;
+            cells[3].textContent = stat.packets_sent_rate;
+            cells[4].textContent = stat.dummy_packets;
+            return statDiv;
+        }
+        
+        function connectionRow(conn, node) {
+            const connDiv = node || makeRow('connection-row', ['', '', '', '', 'encrypted']);
+            const cells = connDiv.cells;
+            cells[0].textContent = conn.timestamp;
+            cells[1].textContent = conn.local;
+            cells[2].textContent = conn.remote;
+            cells[3].textContent = conn.protocol;
+            cells[4].textContent = conn.status;
+            return connDiv;
+        }
+        
+        let lastInterfaces = '';  // JSON of the interfaces currently rendered
+        
+        function setIpField(id, value) {
+            // Show the field's row only when it has a value; write text only on change
+            const span = document.getElementById(id);
+            span.parentElement.hidden = !value;
+            if (value && span.textContent !== value) {
+                span.textContent = value;
             }
         }
         
-        function stopAllAndShutdown() {
-            if (confirm('⚠️ This will stop ALL protections and prepare for safe shutdown. Continue?')) {
-                if (ws && ws.readyState === WebSocket.OPEN) {
-                    ws.send(JSON.stringify({action: 'stop_all_shutdown'}));
+        function updateIpInfo(info) {
+            // Update IP information; the layout is static, only the values change
+            const error = info.error || '';
+            const location = info.city && info.country ? `${info.city}, ${info.country}` : '';
+            setIpField('ip-error', error);
+            setIpField('ip-public', error ? '' : info.public_ip || '');
+            setIpField('ip-location', error ? '' : location);
+            setIpField('ip-isp', error ? '' : info.isp || '');
+            
+            const interfaces = error ? null : info.interfaces;
+            document.getElementById('ip-ifaces-section').hidden = !interfaces;
+            if (interfaces) {
+                const snapshot = JSON.stringify(interfaces);
+                if (snapshot !== lastInterfaces) {
+                    lastInterfaces = snapshot;
+                    document.getElementById('ip-ifaces').replaceChildren(...interfaces.map(interfaceBlock));
                 }
             }
+            
+            const placeholder = document.getElementById('ip-placeholder');
+            placeholder.textContent = 'No IP information available';
+            placeholder.hidden = Boolean(error || info.public_ip || location || info.isp || interfaces);
+        }
+        
+        function interfaceBlock(iface) {
+            const block = document.createElement('p');
+            block.style.marginLeft = '20px';
+            const name = document.createElement('strong');
+            name.textContent = iface.name + ':';
+            block.appendChild(name);
+            iface.addresses.forEach(addr => {
+                block.appendChild(document.createElement('br'));
+                block.appendChild(document.createTextNode('\\u00a0\\u00a0' + addr));
+            });
+            return block;
         }
         
+        // One listener for every control button; the action name is on the button
+        document.getElementById('controls').addEventListener('click', event => {
+            const button = event.target.closest('button[data-action]');
+            if (!button) {
+                return;
+            }
+            if (button.dataset.confirm && !confirm(button.dataset.confirm)) {
+                return;
+            }
+            if (ws && ws.readyState === WebSocket.OPEN) {
+                ws.send(JSON.stringify({action: button.dataset.action}));
+            }
+        });
+        
         // Connect on page load
         connect();
     </script>
 </body>
 </html>
-        """
-        return web.Response(text=html, content_type='text/html')
-    
-    async def create_app(self):
-        """Create the web application"""
-        app = web.Application()
-        
-        # Add routes
-        app.router.add_get('/', self.index_handler)
-        app.router.add_get('/ws', self.websocket_handler)
-        
-        # Setup CORS
-        cors = aiohttp_cors.setup(app, defaults={
-            "*": aiohttp_cors.ResourceOptions(
-                allow_credentials=True,
-                expose_headers="*",
-                allow_headers="*",
-                allow_methods="*"
-            )
-        })
-        
-        # Add CORS to all routes
-        for route in list(app.router.routes()):
-            cors.add(route)
-        
-        return app
-    
-    async def run_server(self, host='localhost', port=8080):
-        """Run the web server"""
-        self.app = await self.create_app()
-        
-        # Start periodic updates task
-        asyncio.create_task(self.periodic_updates())
-        
-        runner = web.AppRunner(self.app)
-        await runner.setup()
-        
-        site = web.TCPSite(runner, host, port)
-        await site.start()
-        
-        print(f"🌐 Web monitor started at http://{host}:{port}")
-        print("🔍 Open this URL in your browser to see real-time protection status")
-        print("🚨 IMPORTANT: When you're done, use the STOP buttons in web interface first!")
-        print("🚨 Then press Ctrl+C to safely shutdown and restore system settings")
-        print("Press Ctrl+C to stop")
-        
-        try:
-            # Keep the server running
-            while True:
-                await asyncio.sleep(1)
-        except KeyboardInterrupt:
-            print("\n🛑 Stopping web monitor...")
-        finally:
-            await self.cleanup()
-            await runner.cleanup()
-    
-    async def cleanup(self):
-        """Clean up resources and restore system settings"""
-        try:
-            print("\n🛑 Cleaning up and restoring system settings...")
-            
-            # Stop all monitoring tasks first
-            for task in self.monitoring_tasks:
-                task.cancel()
-            self.monitoring_tasks = []
-            
-            # Stop protection handlers and restore settings
-            if self.dns_handler:
-                print("🌐 Stopping DNS protection and restoring DNS settings...")
-                await self.dns_handler.stop()
-                self.dns_handler = None
-                print("✅ DNS settings restored")
-                
-            if self.padding_handler:
-                print("📦 Stopping traffic obfuscation...")
-                await self.padding_handler.stop()
-                self.padding_handler = None
-                print("✅ Traffic obfuscation stopped")
-            
-            # Notify all connected clients about shutdown
-            if self.websockets:
-                shutdown_message = json.dumps({
-                    'type': 'shutdown',
-                    'message': 'Server shutting down - all protections stopped'
-                })
-                
-                for ws in list(self.websockets):
-                    try:
-                        await ws.send_str(shutdown_message)
-                        await ws.close()
-                    except:
-                        pass
-            
-            print("✅ All protections stopped and system restored to normal")
-            print("✅ Safe to close terminal")
-            
-        except Exception as e:
-            logger.error(f"Cleanup error: {e}")
-            print(f"⚠️  Cleanup error: {e}")
-            print("🔧 Manual cleanup may be required")
+"""
+
+_INDEX_HTML_BYTES = _INDEX_HTML.encode('utf-8')
+_INDEX_HTML_GZIP = gzip.compress(_INDEX_HTML_BYTES, 6, mtime=0)
+_INDEX_ETAG = f'"{hashlib.md5(_INDEX_HTML_BYTES).hexdigest()}"'
+# Strong validators must match byte-identical bodies, so gzip gets its own
+_INDEX_ETAG_GZIP = f'"{hashlib.md5(_INDEX_HTML_BYTES).hexdigest()}-gz"'
 
 def main():
     """Entry point"""